@@ -66,7 +66,7 @@ def check_environment():
     checks = [
         ("Python 3", lambda: sys.version_info >= (3, 6)),
         ("項目目錄", lambda: Path("robot_core").exists()),
-        ("car_run_turn.py", lambda: Path("robot_core/state_machine/car_run_turn.py").exists()),
+        ("car_run_turn.py", lambda: Path("robot_core/hardware/car_run_turn.py").exists()),
         ("start_pi_server.py", lambda: Path("start_pi_server.py").exists()),
     ]
     
@@ -118,7 +118,7 @@ def test_simulation_mode():
     
     try:
         # 檢查文件存在
-        car_control_file = Path("robot_core/state_machine/car_run_turn.py")
+        car_control_file = Path("robot_core/hardware/car_run_turn.py")
         if not car_control_file.exists():
             print_error("找不到 car_run_turn.py 文件")
             return False
@@ -327,7 +327,7 @@ def test_motor_control():
     
     if response == 'y':
         try:
-            car_control_file = Path("robot_core/state_machine/car_run_turn.py")
+            car_control_file = Path("robot_core/hardware/car_run_turn.py")
             
             print_colored("啟動電機控制程序...", Colors.BLUE)
             print("測試順序：")
@@ -399,7 +399,7 @@ def test_vehicle_movement():
         
         if control_method == "1":
             print_colored("啟動車輛控制程序...", Colors.BLUE)
-            car_control_file = Path("robot_core/state_machine/car_run_turn.py")
+            car_control_file = Path("robot_core/hardware/car_run_turn.py")
             subprocess.run([sys.executable, str(car_control_file)])
             
         elif control_method == "2":
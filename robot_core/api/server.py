@@ -19,14 +19,14 @@ from fastapi import FastAPI, WebSocket, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse, HTMLResponse, StreamingResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import uvicorn
 
 from robot_core.utils.logger import ContextualLogger
 from robot_core.navigation.path_planner import Point, NavigationCommand
 from robot_core.hardware.motor_controller import MotorCommand
 from robot_core.navigation.polycam_processor import PolycamProcessor
-from robot_core.hardware.car_run_turn import CarRunTurnController, create_car_controller
+from robot_core.hardware.car_run_turn import CarRunTurnController, create_car_controller, MAX_DURATION
 
 
 # 數據模型
@@ -44,7 +44,8 @@ class ManualControlRequest(BaseModel):
 class CarControlRequest(BaseModel):
     """核心車輛控制請求"""
     action: str  # forward, backward, turn_left, turn_right, stop, emergency_stop
-    duration: float = 0.5  # 持續時間
+    duration: float = Field(0.5, gt=0, le=MAX_DURATION)  # 持續時間 (秒)，有限上限同時排除 inf
+    speed: float = Field(100.0, ge=0, le=100)  # 速度百分比 (0-100)，低於100時使用PWM調速，0 表示停止
 
 
 class CarStatusResponse(BaseModel):
@@ -75,6 +76,12 @@ class MapSelectionRequest(BaseModel):
     map_id: str
 
 
+def encode_frame_base64(frame) -> str:
+    """將影像幀編碼為JPEG並轉為base64字串 (同步，供執行器調用)"""
+    _, buffer = cv2.imencode('.jpg', frame)
+    return base64.b64encode(buffer).decode('utf-8')
+
+
 class WebSocketManager:
     """WebSocket連接管理器"""
     
@@ -138,12 +145,18 @@ def create_app(robot_system=None):
     )
     
     # CORS中間件
+    if robot_system and not robot_system.config.api_config.allow_all_origins:
+        # 使用配置中預編譯的來源正則，支援 "http://192.168.1.*" 等萬用字元
+        cors_options = {"allow_origin_regex": robot_system.config.api_config.cors_origin_regex}
+    else:
+        cors_options = {"allow_origins": ["*"]}
+    
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=["*"],  # 生產環境中應該限制具體域名
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        **cors_options
     )
     
     # WebSocket管理器
@@ -374,9 +387,10 @@ def create_app(robot_system=None):
             if not vision_data or vision_data.processed_frame is None:
                 raise HTTPException(status_code=404, detail="無可用影像")
             
-            # 編碼圖像為JPEG
-            _, buffer = cv2.imencode('.jpg', vision_data.processed_frame)
-            img_base64 = base64.b64encode(buffer).decode('utf-8')
+            # 編碼圖像為JPEG (在執行器中運行，避免阻塞事件循環)
+            img_base64 = await asyncio.get_running_loop().run_in_executor(
+                None, encode_frame_base64, vision_data.processed_frame
+            )
             
             return {
                 "image": f"data:image/jpeg;base64,{img_base64}",
@@ -498,16 +512,16 @@ def create_app(robot_system=None):
             duration = request.duration
             
             if action == "forward":
-                await car_controller.forward(duration)
+                await car_controller.forward(duration, request.speed)
                 message = f"前進 {duration}秒"
             elif action == "backward":
-                await car_controller.backward(duration)
+                await car_controller.backward(duration, request.speed)
                 message = f"後退 {duration}秒"
             elif action == "turn_left":
-                await car_controller.turn_left(duration)
+                await car_controller.turn_left(duration, request.speed)
                 message = f"左轉 {duration}秒"
             elif action == "turn_right":
-                await car_controller.turn_right(duration)
+                await car_controller.turn_right(duration, request.speed)
                 message = f"右轉 {duration}秒"
             elif action == "stop":
                 await car_controller.stop()
@@ -524,6 +538,12 @@ def create_app(robot_system=None):
                 "status": car_controller.get_status()
             }
             
+        except HTTPException:
+            raise
+        except ValueError as e:
+            # 參數超出控制器能力 (如後端不支持PWM調速)
+            logger.warning(f"車輛控制請求無效: {e}")
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             logger.error(f"車輛控制失敗: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -569,12 +589,16 @@ def create_app(robot_system=None):
             
             # 執行測試序列
             await car_controller.forward(0.5)
+            await car_controller.wait_stopped()
             await asyncio.sleep(0.2)
             await car_controller.turn_right(0.5)
+            await car_controller.wait_stopped()
             await asyncio.sleep(0.2)
             await car_controller.backward(0.5)
+            await car_controller.wait_stopped()
             await asyncio.sleep(0.2)
             await car_controller.turn_left(0.5)
+            await car_controller.wait_stopped()
             await asyncio.sleep(0.2)
             await car_controller.stop()
             
@@ -6,8 +6,9 @@
 """
 
 import os
+import re
 from dataclasses import dataclass, field
-from typing import Dict, List, Tuple
+from typing import Dict, List, Pattern, Tuple
 from pathlib import Path
 
 
@@ -102,6 +103,20 @@ class NavigationConfig:
     max_iterations: int = 1000
 
 
+def _origin_to_regex(origin: str) -> str:
+    """
+    將CORS來源 (可含 * 萬用字元) 轉為正則
+    
+    * 只匹配單個主機名片段 (數字、字母與 -，不含 . / :)，
+    因此 "http://192.168.1.*" 不會匹配 "http://192.168.1.evil.com"；
+    含萬用字元且未指定端口的來源允許任意端口
+    """
+    pattern = re.escape(origin).replace(r"\*", "[0-9A-Za-z-]+")
+    if "*" in origin and ":" not in origin.split("://", 1)[-1]:
+        pattern += "(?::[0-9]+)?"
+    return pattern
+
+
 @dataclass
 class ApiConfig:
     """API服務配置"""
@@ -115,6 +130,9 @@ class ApiConfig:
         "http://192.168.1.*"
     ])
     
+    # 預編譯的來源匹配正則 (由 cors_origins 生成)
+    _origin_pattern: Pattern = field(init=False, repr=False, compare=False)
+    
     # WebSocket設置
     websocket_heartbeat: int = 30  # 心跳間隔(秒)
     max_connections: int = 10
@@ -122,6 +140,22 @@ class ApiConfig:
     # 文件上傳
     max_file_size: int = 10 * 1024 * 1024  # 10MB
     upload_dir: str = "uploads"
+    
+    def __post_init__(self):
+        """將萬用字元來源預編譯為單一正則，避免每次請求重新解析"""
+        self._origin_pattern = re.compile(
+            "(?:" + "|".join(_origin_to_regex(origin) for origin in self.cors_origins) + r")\Z"
+        )
+    
+    @property
+    def allow_all_origins(self) -> bool:
+        """cors_origins 含 "*" 時允許所有來源 (此時不使用來源正則)"""
+        return "*" in self.cors_origins
+    
+    @property
+    def cors_origin_regex(self) -> str:
+        """供CORS中間件使用的來源正則表達式"""
+        return self._origin_pattern.pattern
 
 
 @dataclass
@@ -4,14 +4,22 @@
 """
 
 import asyncio
+import itertools
 import weakref
 from typing import Dict, List, Callable, Optional, Set, Any
-from collections import defaultdict, deque
+from collections import Counter, deque
 from loguru import logger
 
 from .events import RobotEvent, EventType
 
 
+# 預先生成各事件類型的統計鍵，避免每次發佈時重建字串
+_PUBLISH_STAT_KEYS = {event_type: f'events_{event_type.value}' for event_type in EventType}
+
+# 高頻狀態事件只保留最新一個：未處理前再次發佈時以新事件取代舊事件
+_LATEST_ONLY_TYPES = frozenset({EventType.SENSOR_DATA, EventType.MOTOR_STATUS})
+
+
 class EventBus:
     """
     異步事件總線
@@ -24,25 +32,32 @@ class EventBus:
     - 性能監控
     """
     
-    def __init__(self, max_history: int = 1000):
+    def __init__(self, max_history: int = 1000, max_queue_size: int = 512):
         # 訂閱者管理：event_type -> [handler_function]
-        self._subscribers: Dict[EventType, List[Callable]] = defaultdict(list)
+        self._subscribers: Dict[EventType, List[Callable]] = {}
+        
+        # 事件佇列：按 (緊急標誌, 優先級, 序號) 排序，同優先級保持發佈順序
+        self._event_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
         
-        # 事件佇列：用於異步處理
-        self._event_queue: asyncio.Queue = asyncio.Queue()
+        # 佇列上限：超過時丟棄新的其他類型事件；緊急事件不受限制，
+        # 感測器/電機狀態事件每種最多佔一個位置 (保留最新，見 _LATEST_ONLY_TYPES)
+        self._max_queue_size = max_queue_size
+        self._shedding = False
+        self._latest_events: Dict[EventType, RobotEvent] = {}
         
         # 事件歷史：用於除錯和分析
         self._event_history: deque = deque(maxlen=max_history)
         
         # 統計資料
-        self._stats: Dict[str, int] = defaultdict(int)
+        self._stats: Counter = Counter()
         
         # 事件處理任務
         self._processor_task: Optional[asyncio.Task] = None
         self._is_running = False
         
         # 弱引用訂閱者（防止記憶體洩漏）
-        self._weak_subscribers: Dict[EventType, Set[Any]] = defaultdict(set)
+        self._weak_subscribers: Dict[EventType, Set[Any]] = {}
         
         logger.info("🚌 事件總線已初始化")
     
@@ -81,16 +96,17 @@ class EventBus:
             weak_ref: 是否使用弱引用（防止記憶體洩漏）
         """
         if weak_ref:
-            self._weak_subscribers[event_type].add(weakref.ref(handler))
+            self._weak_subscribers.setdefault(event_type, set()).add(weakref.ref(handler))
         else:
-            self._subscribers[event_type].append(handler)
+            self._subscribers.setdefault(event_type, []).append(handler)
         
         logger.debug(f"📋 已訂閱事件類型: {event_type.value}")
     
     def unsubscribe(self, event_type: EventType, handler: Callable):
         """取消訂閱事件"""
-        if handler in self._subscribers[event_type]:
-            self._subscribers[event_type].remove(handler)
+        handlers = self._subscribers.get(event_type, ())
+        if handler in handlers:
+            handlers.remove(handler)
             logger.debug(f"📋 已取消訂閱事件類型: {event_type.value}")
     
     async def publish(self, event: RobotEvent, priority: int = 0):
@@ -101,14 +117,69 @@ class EventBus:
             event: 事件對象
             priority: 優先級（數字越小優先級越高）
         """
-        # 將事件加入佇列
-        await self._event_queue.put((priority, event))
+        self.publish_nowait(event, priority)
+    
+    def publish_nowait(self, event: RobotEvent, priority: int = 0):
+        """
+        發佈事件 (非協程版本，可在同步代碼中直接調用)
+        
+        Args:
+            event: 事件對象
+            priority: 優先級（數字越小優先級越高）
+        """
+        if not self._enqueue(event, priority):
+            return
         
         # 更新統計
-        self._stats['events_published'] += 1
-        self._stats[f'events_{event.event_type.value}'] += 1
+        self._stats.update(('events_published', _PUBLISH_STAT_KEYS[event.event_type]))
         
-        logger.debug(f"📤 已發佈事件: {event.event_type.value} from {event.source}")
+        logger.debug("📤 已發佈事件: {} from {}", event.event_type.value, event.source)
+    
+    def publish_many(self, events: List[RobotEvent], priority: int = 0):
+        """
+        批量發佈事件，統計與日誌只更新一次
+        
+        Args:
+            events: 事件列表（按順序入隊）
+            priority: 優先級（數字越小優先級越高）
+        """
+        published = [event for event in events if self._enqueue(event, priority)]
+        
+        # 更新統計
+        self._stats['events_published'] += len(published)
+        self._stats.update(_PUBLISH_STAT_KEYS[event.event_type] for event in published)
+        
+        logger.debug("📤 已批量發佈 {} 個事件", len(published))
+    
+    def _enqueue(self, event: RobotEvent, priority: int) -> bool:
+        """
+        將事件加入佇列
+        
+        - 緊急事件：總是入隊並排在最前
+        - 感測器/電機狀態事件：同類型已有待處理事件時只更新為最新事件，不重複入隊
+        - 其他事件：佇列已滿時丟棄並返回 False
+        """
+        event_type = event.event_type
+        is_emergency = event_type is EventType.EMERGENCY
+        
+        if event_type in _LATEST_ONLY_TYPES:
+            pending = self._latest_events.get(event_type)
+            self._latest_events[event_type] = event
+            if pending is not None:
+                self._stats['events_coalesced'] += 1
+                return True
+        elif not is_emergency:
+            if self._event_queue.qsize() >= self._max_queue_size:
+                self._stats['events_dropped'] += 1
+                if not self._shedding:
+                    self._shedding = True
+                    logger.warning("⚠️ 事件佇列已滿 ({})，開始丟棄新發佈的事件 (緊急及狀態事件除外)", self._max_queue_size)
+                return False
+            self._shedding = False
+        
+        # 緊急事件排在所有其他事件之前
+        self._event_queue.put_nowait((0 if is_emergency else 1, priority, next(self._sequence), event))
+        return True
     
     async def publish_sync(self, event: RobotEvent):
         """同步發佈事件（立即處理）"""
@@ -119,7 +190,10 @@ class EventBus:
         while self._is_running:
             try:
                 # 獲取事件（優先級排序）
-                priority, event = await self._event_queue.get()
+                *_, event = await self._event_queue.get()
+                if event.event_type in _LATEST_ONLY_TYPES:
+                    # 入隊後可能已被同類型的新事件取代，處理最新的一個
+                    event = self._latest_events.pop(event.event_type)
                 
                 # 處理事件
                 await self._handle_event(event)
@@ -145,38 +219,43 @@ class EventBus:
             })
             
             # 獲取訂閱者
-            handlers = self._subscribers.get(event.event_type, [])
+            handlers = self._subscribers.get(event.event_type, ())
             
             # 清理弱引用訂閱者
             weak_handlers = []
-            if event.event_type in self._weak_subscribers:
-                for weak_ref in list(self._weak_subscribers[event.event_type]):
-                    handler = weak_ref()
-                    if handler is None:
-                        # 物件已被垃圾回收
-                        self._weak_subscribers[event.event_type].remove(weak_ref)
-                    else:
-                        weak_handlers.append(handler)
+            weak_refs = self._weak_subscribers.get(event.event_type, ())
+            for weak_ref in list(weak_refs):
+                handler = weak_ref()
+                if handler is None:
+                    # 物件已被垃圾回收
+                    weak_refs.remove(weak_ref)
+                else:
+                    weak_handlers.append(handler)
             
-            all_handlers = handlers + weak_handlers
+            all_handlers = [*handlers, *weak_handlers]
             
             if not all_handlers:
-                logger.debug(f"⚠️ 沒有訂閱者處理事件: {event.event_type.value}")
+                logger.debug("⚠️ 沒有訂閱者處理事件: {}", event.event_type.value)
                 return
             
-            # 異步並行處理所有訂閱者
-            tasks = []
+            # 異步並行處理所有訂閱者：協程與執行器 Future 直接交給 gather，不另建 Task
+            loop = asyncio.get_running_loop()
+            awaitables = []
             for handler in all_handlers:
                 if asyncio.iscoroutinefunction(handler):
-                    tasks.append(asyncio.create_task(handler(event)))
+                    awaitables.append(handler(event))
                 else:
                     # 同步函數，在執行器中運行
-                    tasks.append(asyncio.create_task(
-                        asyncio.get_event_loop().run_in_executor(None, handler, event)
-                    ))
+                    awaitables.append(loop.run_in_executor(None, handler, event))
             
-            # 等待所有處理器完成
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # 等待所有處理器完成 (單一處理器時直接等待，省去 gather 的調度)
+            if len(awaitables) == 1:
+                try:
+                    results = [await awaitables[0]]
+                except Exception as e:
+                    results = [e]
+            else:
+                results = await asyncio.gather(*awaitables, return_exceptions=True)
             
             # 檢查結果
             for i, result in enumerate(results):
@@ -186,27 +265,31 @@ class EventBus:
             # 更新統計
             self._stats['events_processed'] += 1
             
-            logger.debug(f"✅ 事件已處理: {event.event_type.value}, {len(all_handlers)}個處理器")
+            logger.debug("✅ 事件已處理: {}, {}個處理器", event.event_type.value, len(all_handlers))
             
         except Exception as e:
             logger.error(f"❌ 事件處理失敗: {e}")
     
     def get_subscribers_count(self, event_type: EventType) -> int:
         """獲取特定事件類型的訂閱者數量"""
-        normal_count = len(self._subscribers.get(event_type, []))
-        weak_count = len(self._weak_subscribers.get(event_type, set()))
+        normal_count = len(self._subscribers.get(event_type, ()))
+        weak_count = len(self._weak_subscribers.get(event_type, ()))
         return normal_count + weak_count
     
     def get_stats(self) -> Dict[str, Any]:
         """獲取事件總線統計資料"""
+        # 單次遍歷訂閱者字典統計數量，避免逐一事件類型查詢
+        subscribers_by_type = {event_type.value: 0 for event_type in EventType}
+        for event_type, handlers in self._subscribers.items():
+            subscribers_by_type[event_type.value] += len(handlers)
+        for event_type, weak_handlers in self._weak_subscribers.items():
+            subscribers_by_type[event_type.value] += len(weak_handlers)
+
         return {
             'is_running': self._is_running,
             'queue_size': self._event_queue.qsize(),
             'history_size': len(self._event_history),
-            'subscribers_by_type': {
-                event_type.value: self.get_subscribers_count(event_type)
-                for event_type in EventType
-            },
+            'subscribers_by_type': subscribers_by_type,
             'stats': dict(self._stats)
         }
     
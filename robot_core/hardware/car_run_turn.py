@@ -6,45 +6,50 @@
 """
 
 import asyncio
+import functools
+import importlib
+import math
 import time
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
 from enum import Enum
+from loguru import logger
 
-# 樹莓派5兼容的GPIO導入
+# 樹莓派5兼容的GPIO後端，首次創建控制器時才探測 (見 _detect_backend)
 GPIO_LIB = None
 PI_AVAILABLE = False
-GPIO_BACKEND = "simulation"
-
-# 嘗試導入GPIO庫，按優先級
-try:
-    # 首先嘗試 lgpio (樹莓派5推薦)
-    import lgpio
-    GPIO_LIB = "lgpio"
-    PI_AVAILABLE = True
-    GPIO_BACKEND = "lgpio"
-    print("✅ 使用 lgpio 庫 - Pi 5 兼容模式")
-except ImportError:
-    try:
-        # 嘗試 gpiozero (跨平台兼容)
-        from gpiozero import OutputDevice
-        GPIO_LIB = "gpiozero"
-        PI_AVAILABLE = True
-        GPIO_BACKEND = "gpiozero"
-        print("✅ 使用 gpiozero 庫 - 通用兼容模式")
-    except ImportError:
+GPIO_BACKEND = None
+
+# GPIO庫按優先級排列: (後端名稱, 模組名稱, 提示信息)
+_GPIO_BACKEND_CANDIDATES = (
+    ("lgpio", "lgpio", "✅ 使用 lgpio 庫 - Pi 5 兼容模式"),            # 樹莓派5推薦
+    ("gpiozero", "gpiozero", "✅ 使用 gpiozero 庫 - 通用兼容模式"),    # 跨平台兼容
+    ("RPi.GPIO", "RPi.GPIO", "✅ 使用 RPi.GPIO 庫 - 傳統模式"),        # 傳統模式
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _detect_backend() -> str:
+    """按優先級探測可用的GPIO庫，只導入第一個可用的庫"""
+    global GPIO_LIB, PI_AVAILABLE, GPIO_BACKEND
+    
+    for backend, module_name, message in _GPIO_BACKEND_CANDIDATES:
         try:
-            # 最後嘗試傳統的 RPi.GPIO
-            import RPi.GPIO as GPIO
-            GPIO_LIB = "RPi.GPIO"
-            PI_AVAILABLE = True
-            GPIO_BACKEND = "RPi.GPIO"
-            print("✅ 使用 RPi.GPIO 庫 - 傳統模式")
+            importlib.import_module(module_name)
         except ImportError:
-            # 模擬模式，用於開發測試
-            PI_AVAILABLE = False
-            GPIO_BACKEND = "simulation"
-            print("⚠️ 運行在模擬模式 - 樹莓派GPIO不可用")
+            continue
+        
+        GPIO_LIB = backend
+        PI_AVAILABLE = True
+        GPIO_BACKEND = backend
+        print(message)
+        return backend
+    
+    # 模擬模式，用於開發測試
+    PI_AVAILABLE = False
+    GPIO_BACKEND = "simulation"
+    print("⚠️ 運行在模擬模式 - 樹莓派GPIO不可用")
+    return GPIO_BACKEND
 
 # 電機引腳配置 (按照用戶舊檔案 - BCM編號)
 Motor_R1_Pin = 23  # 右電機正轉 GPIO23
@@ -52,6 +57,8 @@ Motor_R2_Pin = 24  # 右電機反轉 GPIO24
 Motor_L1_Pin = 17  # 左電機正轉 GPIO17
 Motor_L2_Pin = 27  # 左電機反轉 GPIO27
 DEFAULT_DURATION = 0.5  # 默認運動時間
+MAX_DURATION = 60.0  # API 允許的單次運動最長時間 (秒)
+MOTOR_PIN_GROUP = [Motor_R1_Pin, Motor_R2_Pin, Motor_L1_Pin, Motor_L2_Pin]  # RPi.GPIO 寫入順序
 
 # BCM模式下的引腳映射 (用於 gpiozero 和 lgpio)
 BCM_Motor_R1_Pin = 23  # GPIO23
@@ -59,6 +66,20 @@ BCM_Motor_R2_Pin = 24  # GPIO24
 BCM_Motor_L1_Pin = 17  # GPIO17
 BCM_Motor_L2_Pin = 27  # GPIO27
 
+# lgpio 引腳組 (組內第 n 個引腳對應寫入值的第 n 位)
+BCM_MOTOR_PIN_GROUP = [BCM_Motor_R1_Pin, BCM_Motor_R2_Pin, BCM_Motor_L1_Pin, BCM_Motor_L2_Pin]
+MOTOR_GROUP_MASK = 0b1111
+
+# PWM調速參數 (僅 lgpio 後端)
+PWM_FREQUENCY = 1000  # PWM頻率 (Hz)，與 MotorConfig.pwm_frequency 一致
+FULL_SPEED = 100.0    # 全速占空比 (%)
+
+# 短於此時間 (秒) 的運動不使用事件循環定時器，改以單調時鐘截止時間計時
+SHORT_PULSE_THRESHOLD = 0.005
+
+# 單調時鐘到牆上時鐘的偏移 (納秒)，僅在輸出狀態時換算
+_WALL_CLOCK_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+
 
 class MotorDirection(Enum):
     """電機運動方向"""
@@ -69,12 +90,42 @@ class MotorDirection(Enum):
     STOP = "stop"
 
 
+# 各運動方向對應的引腳位元組 (bit0=R1, bit1=R2, bit2=L1, bit3=L2)
+MOTOR_PIN_PATTERNS = {
+    MotorDirection.FORWARD: 0b0101,   # R1 + L1
+    MotorDirection.BACKWARD: 0b1010,  # R2 + L2
+    MotorDirection.RIGHT: 0b1001,     # R1(右輪前進) + L2(左輪後退)
+    MotorDirection.LEFT: 0b0110,      # R2(右輪後退) + L1(左輪前進)
+    MotorDirection.STOP: 0b0000,
+}
+
+DIRECTION_LABELS = {
+    MotorDirection.FORWARD: "前進",
+    MotorDirection.BACKWARD: "後退",
+    MotorDirection.RIGHT: "右轉",
+    MotorDirection.LEFT: "左轉",
+}
+
+
+# 控制器狀態整數的位元佈局: bit0=運動中, bit1=緊急停止, bit4-7=方向編號
+_ST_MOVING = 1
+_ST_ESTOP = 2
+_DIR_SHIFT = 4
+_DIRECTIONS = tuple(MotorDirection)
+
+# 各方向對應的狀態位元 (方向編號 + 運動中標誌)，緊急停止位由調用方保留
+_DIRECTION_STATE_BITS = {
+    direction: (index << _DIR_SHIFT) | (_ST_MOVING if direction is not MotorDirection.STOP else 0)
+    for index, direction in enumerate(_DIRECTIONS)
+}
+
+
 @dataclass
 class MotorStatus:
     """電機狀態"""
     is_moving: bool = False
     current_direction: MotorDirection = MotorDirection.STOP
-    last_command_time: float = 0.0
+    last_command_ns: int = 0  # 單調時鐘 (time.monotonic_ns)
     emergency_stop: bool = False
 
 
@@ -84,15 +135,45 @@ class CarRunTurnController:
     提供基礎運動控制，支持多種GPIO庫
     """
     
-    def __init__(self, duration: float = DEFAULT_DURATION, simulation: bool = False):
+    def __init__(self, duration: float = DEFAULT_DURATION, simulation: bool = False,
+                 trace_pins: bool = False):
+        """
+        Args:
+            duration: 默認運動時間 (秒)
+            simulation: 是否強制使用模擬模式
+            trace_pins: 模擬模式下是否以DEBUG日誌輸出每次的引腳狀態
+        """
         self.duration = duration
-        self.simulation = simulation or not PI_AVAILABLE
-        self.status = MotorStatus()
-        self.gpio_backend = GPIO_BACKEND
+        # 明確要求模擬模式時不探測 (也不導入) 任何GPIO庫
+        self.gpio_backend = "simulation" if simulation else _detect_backend()
+        self.simulation = self.gpio_backend == "simulation"
+        # 運動/緊急停止/方向合併為一個狀態整數，對外通過 status 屬性提供 MotorStatus
+        self._state = _DIRECTION_STATE_BITS[MotorDirection.STOP]
+        self._last_command_ns = 0
+        
+        # 定時自動停止：運動命令立即返回，由事件循環在到時後停止電機
+        self._stop_handle: Optional[asyncio.TimerHandle] = None
+        self._stopped = asyncio.Event()
+        self._stopped.set()
+        
+        # 命令佇列：所有運動/停止命令由單一任務依序執行 (首次命令時啟動)
+        self._command_queue: Optional[asyncio.Queue] = None
+        self._command_task: Optional[asyncio.Task] = None
+        
+        # 最後寫入的 (引腳位元組, 占空比)，用於跳過重複寫入；None 表示未知
+        self._pin_state = (MOTOR_PIN_PATTERNS[MotorDirection.STOP], FULL_SPEED)
         
         # GPIO相關變量
         self.gpio_handle = None
+        self.gpio_group_leader = None
         self.motor_pins = {}
+        self._pin_devices = []  # 按 R1, R2, L1, L2 順序排列的 gpiozero 設備
+        
+        # 初始化時綁定的GPIO庫模組
+        self._lgpio = None
+        self._GPIO = None
+        self._group_write = None
+        self._pwm_bits = 0  # 正在輸出PWM的引腳位元組
         
         # 初始化GPIO（如果在真實硬件上）
         if not self.simulation:
@@ -105,13 +186,30 @@ class CarRunTurnController:
                 self.simulation = True
                 self.gpio_backend = "simulation"
         
+        # 一次性解析GPIO後端的寫入函數，避免每次命令重複判斷
+        self._write = {
+            "lgpio": self._set_pins_lgpio,
+            "gpiozero": self._set_pins_gpiozero,
+            "RPi.GPIO": self._set_pins_rpi_gpio,
+            "simulation": self._set_pins_sim if trace_pins else self._set_pins_noop,
+        }[self.gpio_backend]
+        
+        # PWM調速僅 lgpio 後端支持，其他後端只接受全速 (見 set_speed)
+        self._pwm_write = self._set_pins_lgpio_pwm if self._write == self._set_pins_lgpio else None
+        
+        # get_status 返回的字典，每次調用時原地更新
+        self._status_dict: Dict[str, Any] = {
+            "is_moving": False,
+            "current_direction": MotorDirection.STOP.value,
+            "last_command_time": 0.0,
+            "emergency_stop": False,
+            "simulation_mode": self.simulation
+        }
+        
         print(f"CarRunTurnController 初始化完成 - {'模擬模式' if self.simulation else '硬件模式'} ({self.gpio_backend})")
     
     def _initialize_gpio(self):
         """初始化GPIO設置 - 支持多種GPIO庫"""
-        if self.simulation:
-            return
-        
         if self.gpio_backend == "lgpio":
             self._initialize_lgpio()
         elif self.gpio_backend == "gpiozero":
@@ -124,14 +222,17 @@ class CarRunTurnController:
     def _initialize_lgpio(self):
         """使用 lgpio 初始化 (樹莓派5推薦)"""
         import lgpio
+        self._lgpio = lgpio
         
         # 打開GPIO芯片
         self.gpio_handle = lgpio.gpiochip_open(0)
         
-        # 設置引腳為輸出模式
-        pins = [BCM_Motor_R1_Pin, BCM_Motor_R2_Pin, BCM_Motor_L1_Pin, BCM_Motor_L2_Pin]
-        for pin in pins:
-            lgpio.gpio_claim_output(self.gpio_handle, pin, 0)  # 0 = 初始為LOW
+        # 將四個電機引腳作為一組設置為輸出，之後一次 ioctl 即可同時切換
+        lgpio.group_claim_output(self.gpio_handle, BCM_MOTOR_PIN_GROUP, [0] * len(BCM_MOTOR_PIN_GROUP))  # 初始為LOW
+        self.gpio_group_leader = BCM_MOTOR_PIN_GROUP[0]
+        
+        # 預先綁定固定的句柄與組首引腳，寫入時只需傳入引腳位元組
+        self._group_write = functools.partial(lgpio.group_write, self.gpio_handle, self.gpio_group_leader)
         
         print("lgpio GPIO 初始化完成")
     
@@ -146,14 +247,16 @@ class CarRunTurnController:
             'l1': OutputDevice(BCM_Motor_L1_Pin, active_high=True, initial_value=False),
             'l2': OutputDevice(BCM_Motor_L2_Pin, active_high=True, initial_value=False)
         }
+        self._pin_devices = [self.motor_pins[key] for key in ('r1', 'r2', 'l1', 'l2')]
         
         print("gpiozero GPIO 初始化完成")
     
     def _initialize_rpi_gpio(self):
         """使用 RPi.GPIO 初始化 (傳統模式)"""
         import RPi.GPIO as GPIO
+        self._GPIO = GPIO
         
-        GPIO.setmode(GPIO.BOARD)
+        GPIO.setmode(GPIO.BCM)  # 引腳常量為BCM編號，與 gpiozero/lgpio 後端一致
         GPIO.setup(Motor_R1_Pin, GPIO.OUT, initial=GPIO.LOW)
         GPIO.setup(Motor_R2_Pin, GPIO.OUT, initial=GPIO.LOW)
         GPIO.setup(Motor_L1_Pin, GPIO.OUT, initial=GPIO.LOW)
@@ -162,202 +265,311 @@ class CarRunTurnController:
         print("RPi.GPIO 初始化完成")
 
 
-    def _set_motor_pins(self, r1: bool, r2: bool, l1: bool, l2: bool):
-        """設置電機引腳狀態 - 支持多種GPIO庫"""
-        if self.simulation:
-            print(f"模擬電機控制: R1={r1}, R2={r2}, L1={l1}, L2={l2}")
-            return
-        
+    def _set_motor_pins(self, bits: int, duty: float = FULL_SPEED):
+        """
+        設置電機引腳狀態 - 支持多種GPIO庫
+        
+        Args:
+            bits: 引腳位元組 (bit0=R1, bit1=R2, bit2=L1, bit3=L2)
+            duty: 有效引腳的PWM占空比 (%)，低於全速且後端支持時使用PWM
+        """
         try:
-            if self.gpio_backend == "lgpio":
-                self._set_pins_lgpio(r1, r2, l1, l2)
-            elif self.gpio_backend == "gpiozero":
-                self._set_pins_gpiozero(r1, r2, l1, l2)
-            elif self.gpio_backend == "RPi.GPIO":
-                self._set_pins_rpi_gpio(r1, r2, l1, l2)
+            if duty < FULL_SPEED and self._pwm_write is not None:
+                self._pwm_write(bits, duty)
+            else:
+                self._write(bits)
+            self._pin_state = (bits, duty)
         except Exception as e:
-            print(f"❌ GPIO控制錯誤: {e}")
+            self._pin_state = None
+            logger.error(f"❌ GPIO控制錯誤: {e}")
     
-    def _set_pins_lgpio(self, r1: bool, r2: bool, l1: bool, l2: bool):
+    def _set_pins_noop(self, bits: int):
+        """模擬模式，不做任何操作"""
+    
+    def _set_pins_sim(self, bits: int):
+        """模擬模式，僅輸出引腳狀態"""
+        logger.opt(lazy=True).debug(
+            "模擬電機控制: R1={}, R2={}, L1={}, L2={}",
+            lambda: bool(bits & 1), lambda: bool(bits & 2), lambda: bool(bits & 4), lambda: bool(bits & 8)
+        )
+    
+    def _set_pins_lgpio(self, bits: int):
         """使用 lgpio 設置引腳"""
-        import lgpio
+        if self.gpio_handle is None:
+            return
+        
+        if self._pwm_bits:
+            self._stop_pwm()
         
+        # 一次寫入整組引腳，H橋兩側同時切換
+        self._group_write(bits, MOTOR_GROUP_MASK)
+    
+    def _set_pins_lgpio_pwm(self, bits: int, duty: float):
+        """使用 lgpio PWM 設置引腳：有效引腳輸出PWM，其餘保持LOW"""
         if self.gpio_handle is None:
             return
         
-        pins_values = [
-            (BCM_Motor_R1_Pin, int(r1)),
-            (BCM_Motor_R2_Pin, int(r2)),
-            (BCM_Motor_L1_Pin, int(l1)),
-            (BCM_Motor_L2_Pin, int(l2))
-        ]
+        if self._pwm_bits:
+            self._stop_pwm()
         
-        for pin, value in pins_values:
-            lgpio.gpio_write(self.gpio_handle, pin, value)
+        self._group_write(0, MOTOR_GROUP_MASK)
+        for bit, pin in enumerate(BCM_MOTOR_PIN_GROUP):
+            if (bits >> bit) & 1:
+                self._lgpio.tx_pwm(self.gpio_handle, pin, PWM_FREQUENCY, duty)
+        self._pwm_bits = bits
+    
+    def _stop_pwm(self):
+        """停止所有正在輸出的PWM"""
+        for bit, pin in enumerate(BCM_MOTOR_PIN_GROUP):
+            if (self._pwm_bits >> bit) & 1:
+                self._lgpio.tx_pwm(self.gpio_handle, pin, 0, 0)
+        self._pwm_bits = 0
     
-    def _set_pins_gpiozero(self, r1: bool, r2: bool, l1: bool, l2: bool):
+    def _set_pins_gpiozero(self, bits: int):
         """使用 gpiozero 設置引腳"""
-        if not self.motor_pins:
+        # 只寫入電平改變的引腳 (每次 value 寫入都經過 libgpiod)；狀態未知時全部寫入
+        changed = MOTOR_GROUP_MASK if self._pin_state is None else bits ^ self._pin_state[0]
+        for bit, device in enumerate(self._pin_devices):
+            if (changed >> bit) & 1:
+                device.value = (bits >> bit) & 1
+    
+    def _set_pins_rpi_gpio(self, bits: int):
+        """使用 RPi.GPIO 設置引腳"""
+        # 以通道列表一次調用寫入四個引腳，減少兩側電機切換之間的間隔
+        self._GPIO.output(MOTOR_PIN_GROUP, [(bits >> bit) & 1 for bit in range(len(MOTOR_PIN_GROUP))])
+    
+    def _apply_direction(self, direction: MotorDirection, duty: float = FULL_SPEED, force: bool = False):
+        """寫入方向對應的引腳位元組並更新狀態 (引腳已是目標狀態時跳過寫入)"""
+        bits = MOTOR_PIN_PATTERNS[direction]
+        if force or (bits, duty) != self._pin_state:
+            self._set_motor_pins(bits, duty)
+        self._state = (self._state & _ST_ESTOP) | _DIRECTION_STATE_BITS[direction]
+        self._last_command_ns = time.monotonic_ns()
+        
+        if direction is MotorDirection.STOP:
+            self._stopped.set()
+        else:
+            self._stopped.clear()
+    
+    def _cancel_auto_stop(self):
+        """取消尚未執行的定時停止"""
+        if self._stop_handle is not None:
+            self._stop_handle.cancel()
+            self._stop_handle = None
+    
+    def _auto_stop(self):
+        """定時停止回調 (由事件循環調用)"""
+        self._stop_handle = None
+        self._sync_stop()
+    
+    def _sync_stop(self):
+        """停止所有電機 (同步版本)"""
+        if self._state & _ST_ESTOP:
+            logger.debug("緊急停止狀態中")
             return
         
-        if r1:
-            self.motor_pins['r1'].on()
-        else:
-            self.motor_pins['r1'].off()
+        self._apply_direction(MotorDirection.STOP)
+        logger.debug("電機已停止")
+    
+    async def _drive(self, direction: MotorDirection, duration: Optional[float] = None,
+                     speed: float = FULL_SPEED):
+        """
+        提交運動命令，待命令處理任務設置引腳後返回
+        
+        命令按提交順序由單一任務執行，新命令會取代尚未執行的定時停止；
+        需要等待運動結束時使用 wait_stopped()
+        """
+        loop = asyncio.get_running_loop()
+        if self._command_task is None or self._command_task.done():
+            self._command_queue = asyncio.Queue()
+            self._command_task = loop.create_task(self._process_commands(self._command_queue))
+        
+        done = loop.create_future()
+        self._command_queue.put_nowait((direction, duration, speed, done))
+        await done
+    
+    async def _process_commands(self, queue: asyncio.Queue):
+        """命令處理任務：唯一執行運動命令的消費者"""
+        try:
+            while True:
+                direction, duration, speed, done = await queue.get()
+                try:
+                    await self._execute_drive(direction, duration, speed)
+                finally:
+                    if not done.done():
+                        done.set_result(None)
+        finally:
+            # 任務被取消時，通知仍在等待的命令
+            while not queue.empty():
+                *_, done = queue.get_nowait()
+                done.cancel()
+    
+    async def _execute_drive(self, direction: MotorDirection, duration: Optional[float], speed: float):
+        """按指定方向以 speed (%) 運動，duration 秒後自動停止"""
+        if direction is MotorDirection.STOP:
+            self._cancel_auto_stop()
+            self._sync_stop()
+            return
         
-        if r2:
-            self.motor_pins['r2'].on()
-        else:
-            self.motor_pins['r2'].off()
+        label = DIRECTION_LABELS[direction]
+        if self._state & _ST_ESTOP:
+            logger.warning("緊急停止狀態中，忽略{}命令", label)
+            return
         
-        if l1:
-            self.motor_pins['l1'].on()
-        else:
-            self.motor_pins['l1'].off()
+        if duration is None:
+            duration = self.duration
+        logger.debug("{} {}秒 速度{}%", label, duration, speed)
         
-        if l2:
-            self.motor_pins['l2'].on()
-        else:
-            self.motor_pins['l2'].off()
-    
-    def _set_pins_rpi_gpio(self, r1: bool, r2: bool, l1: bool, l2: bool):
-        """使用 RPi.GPIO 設置引腳"""
-        import RPi.GPIO as GPIO
+        self._cancel_auto_stop()
+        self._apply_direction(direction, speed)
         
-        GPIO.output(Motor_R1_Pin, r1)
-        GPIO.output(Motor_R2_Pin, r2)
-        GPIO.output(Motor_L1_Pin, l1)
-        GPIO.output(Motor_L2_Pin, l2)
+        if duration >= SHORT_PULSE_THRESHOLD:
+            self._stop_handle = asyncio.get_running_loop().call_later(duration, self._auto_stop)
+        elif duration > 0:
+            await self._short_pulse(duration)
+    
+    async def _short_pulse(self, duration: float):
+        """
+        短脈衝計時：定時器精度受限於系統時鐘 (約1ms)，
+        因此在截止時間前以 sleep(0) 讓出事件循環，到時後停止電機
+        """
+        command_ns = self._last_command_ns
+        deadline_ns = command_ns + int(duration * 1e9)
+        while time.monotonic_ns() < deadline_ns:
+            await asyncio.sleep(0)
+        
+        # 期間若有新命令 (含緊急停止) 則交由新命令處理
+        if self._last_command_ns == command_ns:
+            self._sync_stop()
     
     async def stop(self):
         """停止所有電機"""
-        if self.status.emergency_stop:
-            print("緊急停止狀態中")
-            return
-            
-        self._set_motor_pins(False, False, False, False)
-        self.status.is_moving = False
-        self.status.current_direction = MotorDirection.STOP
-        self.status.last_command_time = time.time()
-        print("電機已停止")
-
-    async def forward(self, duration: Optional[float] = None):
-        """前進"""
-        if self.status.emergency_stop:
-            print("緊急停止狀態中，忽略前進命令")
+        await self._drive(MotorDirection.STOP)
+    
+    async def wait_stopped(self):
+        """等待電機停止 (定時停止、手動停止或緊急停止)"""
+        await self._stopped.wait()
+
+    async def set_speed(self, direction: MotorDirection, duty: float, duration: Optional[float] = None):
+        """
+        以指定占空比按方向運動
+        
+        Args:
+            direction: 運動方向
+            duty: 占空比 (0-100%)，由 lgpio 在有效方向引腳上輸出PWM；0 表示停止。
+                  其他GPIO後端不支持PWM，只接受全速 (100%)
+            duration: 持續時間 (秒)；None 使用默認值，0 表示持續運動直到停止
+        
+        Raises:
+            ValueError: 時長無效，或GPIO後端不支持所需的PWM調速
+        """
+        # 占空比為 0 (或 NaN) 時不會轉動，直接停止
+        if direction is MotorDirection.STOP or not duty > 0.0:
+            await self.stop()
             return
-            
-        duration = duration or self.duration
-        print(f"前進 {duration}秒")
         
-        self._set_motor_pins(True, False, True, False)
-        self.status.is_moving = True
-        self.status.current_direction = MotorDirection.FORWARD
-        self.status.last_command_time = time.time()
+        # 負數、NaN 或無限時長會讓電機無法自動停止
+        if duration is not None and not 0.0 <= duration < math.inf:
+            raise ValueError(f"無效的運動時長: {duration}")
         
-        if duration > 0:
-            await asyncio.sleep(duration)
-            await self.stop()
-
-    async def backward(self, duration: Optional[float] = None):
-        """後退"""
-        if self.status.emergency_stop:
-            print("緊急停止狀態中，忽略後退命令")
-            return
-            
-        duration = duration or self.duration
-        print(f"後退 {duration}秒")
+        # 以比較代替 max()/min() 調用限幅
+        if duty > FULL_SPEED:
+            duty = FULL_SPEED
         
-        self._set_motor_pins(False, True, False, True)
-        self.status.is_moving = True
-        self.status.current_direction = MotorDirection.BACKWARD
-        self.status.last_command_time = time.time()
+        # 不支持PWM的後端若照常寫入引腳會以全速運動，不可靜默忽略調速要求
+        if duty < FULL_SPEED and self._pwm_write is None and not self.simulation:
+            raise ValueError(f"{self.gpio_backend} 後端不支持PWM調速，速度必須為 {FULL_SPEED:g}%")
         
-        if duration > 0:
-            await asyncio.sleep(duration)
-            await self.stop()
+        await self._drive(direction, duration, duty)
+
+    async def forward(self, duration: Optional[float] = None, speed: float = FULL_SPEED):
+        """前進"""
+        await self.set_speed(MotorDirection.FORWARD, speed, duration)
 
-    async def turn_right(self, duration: Optional[float] = None):
+    async def backward(self, duration: Optional[float] = None, speed: float = FULL_SPEED):
+        """後退"""
+        await self.set_speed(MotorDirection.BACKWARD, speed, duration)
+
+    async def turn_right(self, duration: Optional[float] = None, speed: float = FULL_SPEED):
         """右轉 - 按照舊檔案邏輯 (右輪前進，左輪後退)"""
-        if self.status.emergency_stop:
-            print("緊急停止狀態中，忽略右轉命令")
-            return
-            
-        duration = duration or self.duration
-        print(f"右轉 {duration}秒")
-        
-        # 按照舊檔案邏輯: R1=True(右輪前進), L2=True(左輪後退)
-        self._set_motor_pins(True, False, False, True)
-        self.status.is_moving = True
-        self.status.current_direction = MotorDirection.RIGHT
-        self.status.last_command_time = time.time()
-        
-        if duration > 0:
-            await asyncio.sleep(duration)
-            await self.stop()
+        await self.set_speed(MotorDirection.RIGHT, speed, duration)
 
-    async def turn_left(self, duration: Optional[float] = None):
+    async def turn_left(self, duration: Optional[float] = None, speed: float = FULL_SPEED):
         """左轉 - 按照舊檔案邏輯 (右輪後退，左輪前進)"""
-        if self.status.emergency_stop:
-            print("緊急停止狀態中，忽略左轉命令")
-            return
-            
-        duration = duration or self.duration
-        print(f"左轉 {duration}秒")
-        
-        # 按照舊檔案邏輯: R2=True(右輪後退), L1=True(左輪前進)
-        self._set_motor_pins(False, True, True, False)
-        self.status.is_moving = True
-        self.status.current_direction = MotorDirection.LEFT
-        self.status.last_command_time = time.time()
-        
-        if duration > 0:
-            await asyncio.sleep(duration)
-            await self.stop()
+        await self.set_speed(MotorDirection.LEFT, speed, duration)
     
     async def emergency_stop(self):
         """緊急停止"""
-        print("🚨 執行緊急停止")
-        self.status.emergency_stop = True
-        self._set_motor_pins(False, False, False, False)
-        self.status.is_moving = False
-        self.status.current_direction = MotorDirection.STOP
-        self.status.last_command_time = time.time()
+        logger.warning("🚨 執行緊急停止")
+        self._cancel_auto_stop()
+        self._state |= _ST_ESTOP
+        # 緊急停止不經過命令佇列，立即強制寫入；佇列中的命令會因緊急停止狀態被忽略
+        self._apply_direction(MotorDirection.STOP, force=True)
     
     def reset_emergency_stop(self):
         """重置緊急停止狀態"""
-        print("重置緊急停止狀態")
-        self.status.emergency_stop = False
+        logger.info("重置緊急停止狀態")
+        self._state &= ~_ST_ESTOP
+    
+    def _last_command_wall_time(self) -> float:
+        """將最後命令的單調時間戳換算為牆上時間 (秒)"""
+        if not self._last_command_ns:
+            return 0.0
+        return (self._last_command_ns + _WALL_CLOCK_OFFSET_NS) / 1e9
+    
+    @property
+    def status(self) -> MotorStatus:
+        """當前狀態快照 (由狀態整數解碼)"""
+        state = self._state
+        return MotorStatus(
+            is_moving=bool(state & _ST_MOVING),
+            current_direction=_DIRECTIONS[state >> _DIR_SHIFT],
+            last_command_ns=self._last_command_ns,
+            emergency_stop=bool(state & _ST_ESTOP)
+        )
     
     def get_status(self) -> Dict[str, Any]:
-        """獲取當前狀態"""
-        return {
-            "is_moving": self.status.is_moving,
-            "current_direction": self.status.current_direction.value,
-            "last_command_time": self.status.last_command_time,
-            "emergency_stop": self.status.emergency_stop,
-            "simulation_mode": self.simulation
-        }
+        """
+        獲取當前狀態
+        
+        返回的字典由控制器持有並在下次調用時更新，需要保留時請自行複製
+        """
+        state = self._state
+        status = self._status_dict
+        status["is_moving"] = bool(state & _ST_MOVING)
+        status["current_direction"] = _DIRECTIONS[state >> _DIR_SHIFT].value
+        status["last_command_time"] = self._last_command_wall_time()
+        status["emergency_stop"] = bool(state & _ST_ESTOP)
+        return status
     
     def cleanup(self):
         """清理資源 - 支持多種GPIO庫"""
+        # 運動命令不等待運動結束即返回，釋放引腳前必須先強制停止電機
+        self._apply_direction(MotorDirection.STOP, force=True)
+        self._cancel_auto_stop()
+        
+        if self._command_task is not None:
+            self._command_task.cancel()
+            self._command_task = None
+        
         if self.simulation:
             print("CarRunTurnController 資源已清理 (模擬模式)")
             return
         
         try:
             if self.gpio_backend == "lgpio" and self.gpio_handle is not None:
-                import lgpio
-                # 釋放所有引腳
-                pins = [BCM_Motor_R1_Pin, BCM_Motor_R2_Pin, BCM_Motor_L1_Pin, BCM_Motor_L2_Pin]
-                for pin in pins:
-                    try:
-                        lgpio.gpio_free(self.gpio_handle, pin)
-                    except:
-                        pass
+                lgpio = self._lgpio
+                # 停止PWM並釋放引腳組
+                if self._pwm_bits:
+                    self._stop_pwm()
+                try:
+                    lgpio.group_free(self.gpio_handle, self.gpio_group_leader)
+                except:
+                    pass
                 # 關閉GPIO芯片
                 lgpio.gpiochip_close(self.gpio_handle)
                 self.gpio_handle = None
+                self._group_write = None
                 
             elif self.gpio_backend == "gpiozero" and self.motor_pins:
                 # gpiozero 會自動清理
@@ -367,10 +579,10 @@ class CarRunTurnController:
                     except:
                         pass
                 self.motor_pins = {}
+                self._pin_devices = []
                 
-            elif self.gpio_backend == "RPi.GPIO":
-                import RPi.GPIO as GPIO
-                GPIO.cleanup()
+            elif self.gpio_backend == "RPi.GPIO" and self._GPIO is not None:
+                self._GPIO.cleanup()
                 
         except Exception as e:
             print(f"❌ GPIO清理錯誤: {e}")
@@ -382,7 +594,7 @@ class CarRunTurnController:
 # 注意：這些函數僅支持 RPi.GPIO，建議使用 CarRunTurnController 類
 def stop():
     """向後兼容的停止函數 (僅限RPi.GPIO)"""
-    if PI_AVAILABLE and GPIO_BACKEND == "RPi.GPIO":
+    if _detect_backend() == "RPi.GPIO":
         import RPi.GPIO as GPIO
         GPIO.output(Motor_R1_Pin, False)
         GPIO.output(Motor_R2_Pin, False)
@@ -394,7 +606,7 @@ def stop():
 
 def forward():
     """向後兼容的前進函數 (僅限RPi.GPIO)"""
-    if PI_AVAILABLE and GPIO_BACKEND == "RPi.GPIO":
+    if _detect_backend() == "RPi.GPIO":
         import RPi.GPIO as GPIO
         GPIO.output(Motor_R1_Pin, True)
         GPIO.output(Motor_R2_Pin, False)
@@ -408,7 +620,7 @@ def forward():
 
 def backward():
     """向後兼容的後退函數 (僅限RPi.GPIO)"""
-    if PI_AVAILABLE and GPIO_BACKEND == "RPi.GPIO":
+    if _detect_backend() == "RPi.GPIO":
         import RPi.GPIO as GPIO
         GPIO.output(Motor_R1_Pin, False)
         GPIO.output(Motor_R2_Pin, True)
@@ -422,7 +634,7 @@ def backward():
 
 def turnRight():
     """向後兼容的右轉函數 (僅限RPi.GPIO) - 右輪前進，左輪停止"""
-    if PI_AVAILABLE and GPIO_BACKEND == "RPi.GPIO":
+    if _detect_backend() == "RPi.GPIO":
         import RPi.GPIO as GPIO
         GPIO.output(Motor_R1_Pin, True)   # 右電機正轉
         GPIO.output(Motor_R2_Pin, False)
@@ -436,7 +648,7 @@ def turnRight():
 
 def turnLeft():
     """向後兼容的左轉函數 (僅限RPi.GPIO) - 左輪前進，右輪停止"""
-    if PI_AVAILABLE and GPIO_BACKEND == "RPi.GPIO":
+    if _detect_backend() == "RPi.GPIO":
         import RPi.GPIO as GPIO
         GPIO.output(Motor_R1_Pin, False)  # 右電機停止
         GPIO.output(Motor_R2_Pin, False)
@@ -457,10 +669,11 @@ async def create_car_controller(duration: float = DEFAULT_DURATION, simulation:
 # 主程序 - 可獨立運行進行測試
 if __name__ == "__main__":
     import sys
+    from pathlib import Path
     
     async def main():
         """主測試程序"""
-        controller = CarRunTurnController(simulation=('--sim' in sys.argv))
+        controller = CarRunTurnController(simulation=('--sim' in sys.argv), trace_pins=True)
         
         print("車輛控制器測試程序")
         print("指令: f=前進, b=後退, r=右轉, l=左轉, s=停止, e=緊急停止, x=重置緊急停止, q=退出")
@@ -472,12 +685,16 @@ if __name__ == "__main__":
                     
                     if ch == 'f':
                         await controller.forward()
+                        await controller.wait_stopped()
                     elif ch == 'b':
                         await controller.backward()
+                        await controller.wait_stopped()
                     elif ch == 'r':
                         await controller.turn_right()
+                        await controller.wait_stopped()
                     elif ch == 'l':
                         await controller.turn_left()
+                        await controller.wait_stopped()
                     elif ch == 's':
                         await controller.stop()
                     elif ch == 'e':
@@ -501,5 +718,10 @@ if __name__ == "__main__":
         finally:
             controller.cleanup()
     
+    # 直接運行本腳本時，將項目根路徑加入 Python 路徑以導入 robot_core
+    sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+    from robot_core.utils.event_loop import install_uvloop
+    install_uvloop()
+    
     # 運行主程序
     asyncio.run(main())
\ No newline at end of file
@@ -21,12 +21,11 @@ project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
 from robot_core.config import RobotConfig
-from robot_core.hardware.motor_controller import MotorController
-from robot_core.hardware.sensor_manager import SensorManager
-from robot_core.ai.vision_system import VisionSystem
-from robot_core.navigation.path_planner import PathPlanner
-from robot_core.api.server import create_app
 from robot_core.utils.logger import setup_logger
+from robot_core.utils.event_loop import install_uvloop
+
+# 硬體、視覺、導航與API模組依賴 OpenCV/GPIO/uvicorn 等較重的庫，
+# 在使用時才導入，讓日誌系統先完成設置並記錄啟動過程
 
 
 class RobotSystem:
@@ -48,18 +47,22 @@ class RobotSystem:
         """初始化所有系統組件"""
         try:
             logger.info("📡 初始化硬體控制模組...")
+            from robot_core.hardware.motor_controller import MotorController
             self.motor_controller = MotorController(self.config.motor_config)
             await self.motor_controller.initialize()
             
             logger.info("🔍 初始化感測器管理器...")
+            from robot_core.hardware.sensor_manager import SensorManager
             self.sensor_manager = SensorManager(self.config.sensor_config)
             await self.sensor_manager.initialize()
             
             logger.info("👁️ 初始化AI視覺系統...")
+            from robot_core.ai.vision_system import VisionSystem
             self.vision_system = VisionSystem(self.config.vision_config)
             await self.vision_system.initialize()
             
             logger.info("🗺️ 初始化路徑規劃器...")
+            from robot_core.navigation.path_planner import PathPlanner
             self.path_planner = PathPlanner(self.config.navigation_config)
             await self.path_planner.initialize()
             
@@ -77,6 +80,10 @@ class RobotSystem:
         """啟動主控制循環"""
         logger.info("🚀 啟動機器人主控制循環...")
         
+        loop = asyncio.get_running_loop()
+        interval = self.config.main_loop_interval
+        next_tick = loop.time() + interval
+        
         while self.is_running:
             try:
                 # 獲取感測器數據
@@ -98,8 +105,15 @@ class RobotSystem:
                 if navigation_command:
                     await self.motor_controller.execute_command(navigation_command)
                 
-                # 控制循環頻率
-                await asyncio.sleep(self.config.main_loop_interval)
+                # 控制循環頻率：按絕對截止時間排程，處理耗時不會累加到週期上
+                delay = next_tick - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    # 本週期已超時，只讓出事件循環並從當前時間重新對齊
+                    await asyncio.sleep(0)
+                    next_tick = loop.time()
+                next_tick += interval
                 
             except Exception as e:
                 logger.error(f"⚠️ 主控制循環異常: {e}")
@@ -164,6 +178,7 @@ async def main():
         await robot.initialize()
         
         # 創建並啟動Web服務
+        from robot_core.api.server import create_app
         app = create_app(robot)
         
         # 啟動主控制循環和Web服務
@@ -183,4 +198,7 @@ async def main():
 
 if __name__ == "__main__":
     logger.info("🤖 啟動樹莓派智能送貨機器人系統")
+    
+    install_uvloop()
+    
     asyncio.run(main()) 
\ No newline at end of file
@@ -17,7 +17,7 @@ import sys
 from pathlib import Path
 from loguru import logger
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import List, Optional
 
 # 添加項目根路徑到Python路徑
 project_root = Path(__file__).parent.parent
@@ -30,6 +30,7 @@ from robot_core.ai.vision_system import VisionSystem
 from robot_core.navigation.path_planner import PathPlanner
 from robot_core.api.server import create_app
 from robot_core.utils.logger import setup_logger
+from robot_core.utils.event_loop import install_uvloop
 
 # 新架構組件
 from robot_core.events import (
@@ -77,6 +78,29 @@ class ImprovedRobotSystem:
         self.is_running = False
         self.emergency_stop_active = False
         
+        # 狀態事件節流：主循環為 20Hz，電機狀態每 5 個週期 (4Hz) 發佈一次
+        self._status_publish_every = 5
+        self._status_publish_counter = 0
+        self._last_motor_status = None  # 最後發佈的 (is_moving, emergency_stop)
+        
+        # 主循環喚醒：週期到時或狀態變化時設置
+        self._wake = asyncio.Event()
+        # 需要週期執行的狀態，其餘狀態 (緊急停止、錯誤) 僅在喚醒時處理
+        self._periodic_states = frozenset({
+            RobotState.IDLE, RobotState.NAVIGATING, RobotState.MAPPING, RobotState.CHARGING
+        })
+        self._standby_interval = 1.0  # 非週期狀態的兜底檢查間隔 (秒)
+        
+        # 狀態處理函數表，主循環按當前狀態直接查表調用
+        self._state_handlers = {
+            RobotState.IDLE: self._handle_idle_state,
+            RobotState.NAVIGATING: self._handle_navigating_state,
+            RobotState.MAPPING: self._handle_mapping_state,
+            RobotState.CHARGING: self._handle_charging_state,
+            RobotState.EMERGENCY_STOP: self._handle_emergency_state,
+            RobotState.ERROR: self._handle_error_state,
+        }
+        
         # 設置日誌
         setup_logger(self.config.log_level)
         logger.info("🤖 初始化改進版機器人系統...")
@@ -179,6 +203,7 @@ class ImprovedRobotSystem:
         async def on_emergency_stop_enter(state):
             logger.warning("🚨 進入緊急停止狀態")
             self.emergency_stop_active = True
+            self._wake.set()
             if self.motor_controller:
                 await self.motor_controller.emergency_stop()
         
@@ -186,15 +211,18 @@ class ImprovedRobotSystem:
         async def on_emergency_stop_exit(state):
             logger.info("✅ 退出緊急停止狀態")
             self.emergency_stop_active = False
+            self._wake.set()
         
         # 進入導航狀態的回調
         async def on_navigating_enter(state):
             logger.info("🧭 開始導航")
+            self._wake.set()
             # 可以在這裡執行導航開始的準備工作
         
         # 進入充電狀態的回調
         async def on_charging_enter(state):
             logger.info("🔋 開始充電")
+            self._wake.set()
             # 停止所有運動
             if self.motor_controller:
                 await self.motor_controller.stop_all()
@@ -265,31 +293,28 @@ class ImprovedRobotSystem:
         """啟動主控制循環"""
         logger.info("🚀 啟動改進版主控制循環...")
         
+        loop = asyncio.get_running_loop()
+        
         while self.is_running:
             try:
+                self._wake.clear()
                 current_state = self.state_machine.current_state
                 
                 # 根據狀態執行相應的行為
-                if current_state == RobotState.IDLE:
-                    await self._handle_idle_state()
-                    
-                elif current_state == RobotState.NAVIGATING:
-                    await self._handle_navigating_state()
-                    
-                elif current_state == RobotState.MAPPING:
-                    await self._handle_mapping_state()
-                    
-                elif current_state == RobotState.CHARGING:
-                    await self._handle_charging_state()
-                    
-                elif current_state == RobotState.EMERGENCY_STOP:
-                    await self._handle_emergency_state()
-                    
-                elif current_state == RobotState.ERROR:
-                    await self._handle_error_state()
+                handler = self._state_handlers.get(current_state)
+                if handler is not None:
+                    await handler()
                 
-                # 控制循環頻率
-                await asyncio.sleep(self.config.main_loop_interval)
+                # 等待下一次喚醒：週期狀態按控制頻率，其餘狀態等待狀態變化
+                if current_state in self._periodic_states:
+                    timeout = self.config.main_loop_interval
+                else:
+                    timeout = self._standby_interval
+                timer = loop.call_later(timeout, self._wake.set)
+                try:
+                    await self._wake.wait()
+                finally:
+                    timer.cancel()
                 
             except Exception as e:
                 logger.error(f"⚠️ 主控制循環異常: {e}")
@@ -302,9 +327,12 @@ class ImprovedRobotSystem:
     
     async def _handle_idle_state(self):
         """處理空閒狀態"""
-        # 在空閒狀態下，主要是數據收集和狀態監控
-        await self._collect_sensor_data()
-        await self._publish_status_events()
+        # 在空閒狀態下，主要是數據收集和狀態監控；本週期的事件合併為一次發佈
+        events = []
+        await self._collect_sensor_data(events)
+        await self._publish_status_events(events)
+        if events:
+            self.event_bus.publish_many(events)
     
     async def _handle_navigating_state(self):
         """處理導航狀態"""
@@ -389,8 +417,13 @@ class ImprovedRobotSystem:
             StateChangeReason.AUTO_RECOVERY
         )
     
-    async def _collect_sensor_data(self):
-        """收集並發佈感測器數據"""
+    async def _collect_sensor_data(self, events: Optional[List] = None):
+        """
+        收集並發佈感測器數據
+        
+        Args:
+            events: 提供時將事件加入此列表由調用方批量發佈，否則立即發佈
+        """
         try:
             sensor_data = await self.sensor_manager.get_all_data()
             
@@ -409,23 +442,48 @@ class ImprovedRobotSystem:
                 # 更新感測器融合系統
                 # self.sensor_fusion.update_imu_data(sensor_data.imu_data)
             
-            await self.event_bus.publish(event)
+            if events is None:
+                self.event_bus.publish_nowait(event)
+            else:
+                events.append(event)
             
         except Exception as e:
             logger.error(f"❌ 感測器數據收集失敗: {e}")
     
-    async def _publish_status_events(self):
-        """發佈系統狀態事件"""
+    async def _publish_status_events(self, events: Optional[List] = None):
+        """
+        發佈系統狀態事件
+        
+        Args:
+            events: 提供時將事件加入此列表由調用方批量發佈，否則立即發佈
+        """
+        self._status_publish_counter += 1
+        if self._status_publish_counter < self._status_publish_every:
+            return
+        self._status_publish_counter = 0
+        
         try:
             # 發佈電機狀態事件
             if self.motor_controller:
                 motor_status = self.motor_controller.get_status()
+                is_moving = motor_status.get('is_moving', False)
+                emergency_stop = motor_status.get('emergency_stop', False)
+                
+                # 靜止且狀態未變化時不重複發佈
+                status_key = (is_moving, emergency_stop)
+                if not is_moving and status_key == self._last_motor_status:
+                    return
+                self._last_motor_status = status_key
+                
                 event = create_motor_status_event(
                     source="MotorController",
-                    is_moving=motor_status.get('is_moving', False),
-                    emergency_stop=motor_status.get('emergency_stop', False)
+                    is_moving=is_moving,
+                    emergency_stop=emergency_stop
                 )
-                await self.event_bus.publish(event)
+                if events is None:
+                    self.event_bus.publish_nowait(event)
+                else:
+                    events.append(event)
             
         except Exception as e:
             logger.error(f"❌ 狀態事件發佈失敗: {e}")
@@ -442,6 +500,7 @@ class ImprovedRobotSystem:
             )
         
         self.is_running = False
+        self._wake.set()
         
         # 關閉各個組件
         if self.sensor_fusion:
@@ -506,6 +565,7 @@ class ImprovedRobotSystem:
                 RobotState.IDLE,
                 StateChangeReason.MANUAL_RECOVERY
             )
+            self._wake.set()
     
     def get_system_status(self):
         """獲取系統完整狀態"""
@@ -588,4 +648,7 @@ async def main():
 
 if __name__ == "__main__":
     logger.info("🤖 啟動改進版樹莓派智能送貨機器人系統")
+    
+    install_uvloop()
+    
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+事件循環配置
+供各入口程序在 asyncio.run() 前統一選擇事件循環實現
+"""
+
+
+def install_uvloop() -> bool:
+    """
+    有 uvloop 時使用 libuv 事件循環，降低任務與定時器調度開銷
+
+    Returns:
+        是否已安裝 uvloop 事件循環策略
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+
+    uvloop.install()
+    return True
@@ -140,8 +140,11 @@ def log_hardware_event(device: str, event: str, value=None, unit: str = ""):
         value: 數值
         unit: 單位
     """
-    value_str = f" | {value}{unit}" if value is not None else ""
-    logger.info(f"HARDWARE | {device} | {event}{value_str}")
+    # 以參數傳給 loguru，日誌等級被過濾時不會格式化消息
+    if value is None:
+        logger.info("HARDWARE | {} | {}", device, event)
+    else:
+        logger.info("HARDWARE | {} | {} | {}{}", device, event, value, unit)
 
 
 def log_ai_detection(model: str, detections: list, processing_time: float):
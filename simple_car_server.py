@@ -13,8 +13,8 @@ import io
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from robot_core.hardware.car_run_turn import create_car_controller, CarRunTurnController
+from pydantic import BaseModel, Field
+from robot_core.hardware.car_run_turn import create_car_controller, CarRunTurnController, MAX_DURATION
 from typing import Optional
 
 # 嘗試導入圖像處理庫
@@ -55,6 +55,11 @@ picam2_instance = None
 # 全域車輛控制器
 car_controller: Optional[CarRunTurnController] = None
 
+# 視覺流畫面快取：攝像頭以 10 FPS 運行，間隔內的重複請求直接返回上一幀
+VISION_FRAME_TTL_NS = 100_000_000  # 0.1秒
+vision_frame_cache: Optional[tuple] = None  # (單調時鐘納秒, 圖像數據)
+vision_frame_lock: Optional[asyncio.Lock] = None  # 首次使用時在服務事件循環中創建 (Python 3.8/3.9 的鎖綁定創建時的循環)
+
 def initialize_picamera2():
     """初始化 picamera2"""
     global picam2_instance
@@ -237,7 +242,8 @@ def capture_real_camera_frame():
 # 請求模型
 class CarControlRequest(BaseModel):
     action: str  # forward, backward, turn_left, turn_right, stop, emergency_stop
-    duration: float = 0.5
+    duration: float = Field(0.5, gt=0, le=MAX_DURATION)  # 持續時間 (秒)，有限上限同時排除 inf
+    speed: float = Field(100.0, ge=0, le=100)  # 速度百分比 (0-100)，0 表示停止
 
 class CarStatusResponse(BaseModel):
     is_moving: bool
@@ -340,16 +346,16 @@ async def car_control(request: CarControlRequest):
         duration = request.duration
         
         if action == "forward":
-            await car_controller.forward(duration)
+            await car_controller.forward(duration, request.speed)
             message = f"前進 {duration}秒"
         elif action == "backward":
-            await car_controller.backward(duration)
+            await car_controller.backward(duration, request.speed)
             message = f"後退 {duration}秒"
         elif action == "turn_left":
-            await car_controller.turn_left(duration)
+            await car_controller.turn_left(duration, request.speed)
             message = f"左轉 {duration}秒"
         elif action == "turn_right":
-            await car_controller.turn_right(duration)
+            await car_controller.turn_right(duration, request.speed)
             message = f"右轉 {duration}秒"
         elif action == "stop":
             await car_controller.stop()
@@ -366,6 +372,12 @@ async def car_control(request: CarControlRequest):
             "status": car_controller.get_status()
         }
         
+    except HTTPException:
+        raise
+    except ValueError as e:
+        # 參數超出控制器能力 (如後端不支持PWM調速)
+        print(f"⚠️ 車輛控制請求無效: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"❌ 車輛控制失敗: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -411,12 +423,16 @@ async def test_car_controller():
         
         # 簡單測試序列
         await car_controller.forward(0.5)
+        await car_controller.wait_stopped()
         await asyncio.sleep(0.2)
         await car_controller.turn_right(0.5)
+        await car_controller.wait_stopped()
         await asyncio.sleep(0.2)
         await car_controller.backward(0.5)
+        await car_controller.wait_stopped()
         await asyncio.sleep(0.2)
         await car_controller.turn_left(0.5)
+        await car_controller.wait_stopped()
         await asyncio.sleep(0.2)
         await car_controller.stop()
         
@@ -436,8 +452,16 @@ async def test_car_controller():
 
 # ===== 視覺流相關函數 =====
 
-def generate_demo_image():
-    """生成攝像頭圖像 - 優先使用真實攝像頭"""
+def generate_demo_image(car_status: Optional[dict] = None):
+    """
+    生成攝像頭圖像 - 優先使用真實攝像頭
+    
+    Args:
+        car_status: 疊加在模擬圖像上的車輛狀態快照 (在執行器中運行時由事件循環預先取得)
+    """
+    if car_status is None:
+        car_status = {}
+    
     # 首先嘗試使用真實攝像頭
     real_frame = capture_real_camera_frame()
     if real_frame:
@@ -446,7 +470,6 @@ def generate_demo_image():
     # 如果真實攝像頭不可用，使用模擬圖像
     if not PIL_AVAILABLE:
         # 如果沒有PIL，創建SVG圖像
-        car_status = car_controller.get_status() if car_controller else {}
         current_time = time.strftime("%Y-%m-%d %H:%M:%S")
         
         svg_content = f'''<svg width="640" height="480" xmlns="http://www.w3.org/2000/svg">
@@ -473,7 +496,6 @@ def generate_demo_image():
         
         # 繪製一些模擬內容
         current_time = time.strftime("%Y-%m-%d %H:%M:%S")
-        car_status = car_controller.get_status() if car_controller else {}
         
         # 嘗試使用默認字體
         try:
@@ -525,20 +547,48 @@ def generate_demo_image():
         print(f"生成模擬圖像失敗: {e}")
         return None
 
+async def get_latest_frame(force: bool = False):
+    """
+    獲取最新畫面，快取有效期內的請求共用同一次捕獲
+    
+    Args:
+        force: 忽略快取，強制重新捕獲
+    """
+    global vision_frame_cache, vision_frame_lock
+    
+    if not force and vision_frame_cache and time.monotonic_ns() - vision_frame_cache[0] < VISION_FRAME_TTL_NS:
+        return vision_frame_cache[1]
+    
+    if vision_frame_lock is None:
+        vision_frame_lock = asyncio.Lock()
+    
+    async with vision_frame_lock:
+        # 等待鎖期間其他請求可能已完成捕獲
+        if not force and vision_frame_cache and time.monotonic_ns() - vision_frame_cache[0] < VISION_FRAME_TTL_NS:
+            return vision_frame_cache[1]
+        
+        # 攝像頭讀取與JPEG編碼會阻塞，放到執行器中運行，避免拖慢車輛控制請求
+        # 狀態字典由控制器原地更新，在事件循環中複製快照後再交給執行器線程
+        car_status = dict(car_controller.get_status()) if car_controller else {}
+        image_data = await asyncio.get_running_loop().run_in_executor(None, generate_demo_image, car_status)
+        if image_data:
+            vision_frame_cache = (time.monotonic_ns(), image_data)
+        return image_data
+
 @app.get("/api/vision/stream")
 async def get_vision_stream():
     """獲取視覺流 - 模擬攝像頭"""
-    start_time = time.time()
+    start_ns = time.monotonic_ns()  # 計時使用單調時鐘，不受系統校時影響
     
     try:
         # 生成模擬圖像
-        image_data = generate_demo_image()
+        image_data = await get_latest_frame()
         
         if not image_data:
             # 如果無法生成圖像，返回錯誤信息
             raise HTTPException(status_code=503, detail="模擬攝像頭不可用 - 請檢查PIL庫安裝")
         
-        processing_time = (time.time() - start_time) * 1000  # 轉換為毫秒
+        processing_time = (time.monotonic_ns() - start_ns) / 1e6  # 轉換為毫秒
         
         # 模擬檢測結果
         import random
@@ -20,7 +20,7 @@ print(f"📁 項目路徑: {PROJECT_ROOT}")
 try:
     # 嘗試導入必要的模組
     import uvicorn
-    from fastapi import FastAPI
+    from fastapi import FastAPI, Query
     from fastapi.middleware.cors import CORSMiddleware
     print("✅ FastAPI 和 uvicorn 可用")
 except ImportError as e:
@@ -57,7 +57,7 @@ async def create_minimal_app():
     
     # 導入車輛控制器
     try:
-        from robot_core.state_machine.car_run_turn import CarRunTurnController
+        from robot_core.hardware.car_run_turn import CarRunTurnController
         car_controller = CarRunTurnController(simulation=not PI_AVAILABLE)
         print(f"✅ 車輛控制器已初始化 - {'硬件模式' if PI_AVAILABLE else '模擬模式'}")
     except Exception as e:
@@ -89,7 +89,7 @@ async def create_minimal_app():
     
     # 車輛控制端點
     @app.post("/api/car/control")
-    async def car_control(action: str, duration: float = 0.5):
+    async def car_control(action: str, duration: float = Query(0.5, gt=0, le=60.0)):  # 上限同 car_run_turn.MAX_DURATION
         if not car_controller:
             return {"success": False, "message": "車輛控制器不可用"}
         
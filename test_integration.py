@@ -18,7 +18,7 @@ async def test_car_controller():
     
     try:
         # 導入車輛控制器
-        from robot_core.state_machine.car_run_turn import CarRunTurnController, create_car_controller
+        from robot_core.hardware.car_run_turn import CarRunTurnController, create_car_controller
         
         print("✅ 成功導入 CarRunTurnController")
         
@@ -36,18 +36,22 @@ async def test_car_controller():
         # 2. 測試前進
         print("⬆️  測試前進...")
         await controller.forward(0.1)
+        await controller.wait_stopped()
         
         # 3. 測試右轉
         print("➡️ 測試右轉...")
         await controller.turn_right(0.1)
+        await controller.wait_stopped()
         
         # 4. 測試後退
         print("⬇️  測試後退...")
         await controller.backward(0.1)
+        await controller.wait_stopped()
         
         # 5. 測試左轉
         print("⬅️ 測試左轉...")
         await controller.turn_left(0.1)
+        await controller.wait_stopped()
         
         # 6. 測試停止
         print("⏹️  測試停止...")
@@ -124,7 +128,7 @@ def test_file_structure():
     print("\n📁 檢查文件結構...")
     
     files_to_check = [
-        "robot_core/state_machine/car_run_turn.py",
+        "robot_core/hardware/car_run_turn.py",
         "robot_core/api/server.py",
         "web_demo/src/components/ManualControl.tsx",
         "web_demo/src/services/RobotApiService.ts",
@@ -19,7 +19,7 @@ async def test_car_controller_standalone():
     
     try:
         # 直接導入車輛控制器模塊
-        sys.path.append('robot_core/state_machine')
+        sys.path.append('robot_core/hardware')
         import car_run_turn
         
         print("✅ 成功導入 car_run_turn 模塊")
@@ -113,7 +113,7 @@ async def test_manual_mode():
     
     try:
         # 導入模組
-        sys.path.append('robot_core/state_machine')
+        sys.path.append('robot_core/hardware')
         import car_run_turn
         
         # 測試創建控制器工廠函數
@@ -148,7 +148,7 @@ def test_gpio_simulation():
     print("\n🔌 測試GPIO模擬...")
     
     try:
-        sys.path.append('robot_core/state_machine')
+        sys.path.append('robot_core/hardware')
         import car_run_turn
         
         # 檢查是否正確檢測到模擬模式
@@ -159,18 +159,20 @@ def test_gpio_simulation():
         assert controller.simulation == True, "應該運行在模擬模式"
         print("✅ 模擬模式正確設置")
         
-        # 測試引腳配置
+        # 測試引腳配置 (BCM 編號)
         expected_pins = {
-            'Motor_R1_Pin': 16,
-            'Motor_R2_Pin': 18,
-            'Motor_L1_Pin': 11,
-            'Motor_L2_Pin': 13
+            'Motor_R1_Pin': 23,
+            'Motor_R2_Pin': 24,
+            'Motor_L1_Pin': 17,
+            'Motor_L2_Pin': 27
         }
         
         for pin_name, expected_value in expected_pins.items():
             actual_value = getattr(car_run_turn, pin_name)
             assert actual_value == expected_value, f"{pin_name} 應該是 {expected_value}，但實際是 {actual_value}"
         
+        assert car_run_turn.MOTOR_PIN_GROUP == list(expected_pins.values()), "MOTOR_PIN_GROUP 應與引腳常量一致"
+        
         print("✅ GPIO引腳配置正確")
         
         return True
@@ -187,7 +189,7 @@ def check_architecture_integration():
     print("\n🏗️ 檢查系統架構整合...")
     
     files_integration = {
-        "核心控制器": "robot_core/state_machine/car_run_turn.py",
+        "核心控制器": "robot_core/hardware/car_run_turn.py",
         "API服務器": "robot_core/api/server.py", 
         "前端組件": "web_demo/src/components/ManualControl.tsx",
         "API服務": "web_demo/src/services/RobotApiService.ts",
@@ -275,8 +277,8 @@ async def main():
         
         print("\n🚀 下一步操作:")
         print("   1. 安裝依賴: pip install fastapi uvicorn")
-        print("   2. 測試核心功能: python robot_core/state_machine/car_run_turn.py --sim")
-        print("   3. 在真實硬件上運行: python robot_core/state_machine/car_run_turn.py")
+        print("   2. 測試核心功能: python robot_core/hardware/car_run_turn.py --sim")
+        print("   3. 在真實硬件上運行: python robot_core/hardware/car_run_turn.py")
         print("   4. 啟動Web界面進行完整測試")
         
     else: